@@ -1,18 +1,48 @@
 import tkinter as tk
 from tkinter import filedialog
 from tkinter import ttk
+from tkinter import font as tkfont
 import subprocess
 import signal
-import datetime
+import contextlib
 import os
 import re
 import logging
 import json
+import time
+import threading
+import platform
 from enum import Enum
+from functools import lru_cache
+from pathlib import Path
 
 # Configure root-level logging
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
 
+# Precompiled patterns used while parsing FFmpeg output and device names
+_AUDIO_DEV_RE = re.compile(r'^\[AVFoundation[^\]]*\]\s+\[(\d+)\]\s+(\S.*)$')
+_CHANNEL_COUNT_RE = re.compile(r'(\d+)ch', re.IGNORECASE)
+
+# Mono / stereo dropdown states per input mode
+_MODE_DROPDOWN_STATES = {
+    "mono": ("readonly", "disabled"),
+    "stereo": ("disabled", "readonly"),
+    "multichannel": ("disabled", "disabled"),
+}
+
+# Leading FFmpeg arguments for every recording, before the input device
+_FFMPEG_RECORD_BASE = (
+    "ffmpeg",
+    "-y",
+    "-probesize", "32",  # start capturing without probing the input first
+    "-analyzeduration", "0",
+    "-f", "avfoundation",
+)
+
+# On-disk cache of the last device enumeration, shown at startup while younger than the TTL
+_DEVICE_CACHE_PATH = os.path.expanduser("~/.cache/simplerecorder/devices.json")
+_DEVICE_CACHE_TTL = 24 * 60 * 60.0  # seconds
+
 class LogSeverity(Enum):
     """
     Enumeration for log severity. Will affect terminal and UI log.
@@ -21,49 +51,151 @@ class LogSeverity(Enum):
     WARNING = "warning"
     ERROR = "error"
 
+def load_cached_devices() -> list:
+    """
+    Returns the cached device list if the cache file exists, is younger than
+    the TTL and was written on this machine, otherwise an empty list.
+    """
+    try:
+        if time.time() - os.path.getmtime(_DEVICE_CACHE_PATH) > _DEVICE_CACHE_TTL:
+            return []
+        with open(_DEVICE_CACHE_PATH, "r", encoding="UTF8") as f:
+            data = json.load(f)
+        if data.get("host") != platform.node():
+            return []
+        return [tuple(device) for device in data["devices"]]
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return []
+
+def save_cached_devices(devices: list) -> None:
+    """
+    Persists the device list so the next launch can show it before FFmpeg has run.
+    """
+    try:
+        os.makedirs(os.path.dirname(_DEVICE_CACHE_PATH), exist_ok=True)
+        with open(_DEVICE_CACHE_PATH, "w", encoding="UTF8") as f:
+            json.dump({"host": platform.node(), "devices": devices}, f)
+    except OSError as e:
+        logging.warning("Could not write device cache: %s", e)
+
 def get_avfoundation_audio_devices() -> list:
     """
-    Runs `ffmpeg -f avfoundation -list_devices true -i ""` and parses stderr
+    Runs `ffmpeg -hide_banner -f avfoundation -list_devices true -i ""` and parses stderr
     to find lines matching the 'AVFoundation audio devices:' section.
     Returns a list of tuples (index_str, device_name).
     Example: [("0", "RME Babyface"), ("1", "Audient EVO16")]
     """
-    cmd = ["ffmpeg", "-f", "avfoundation", "-list_devices", "true", "-i", ""]
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin", "-loglevel", "info",
+           "-f", "avfoundation", "-list_devices", "true", "-i", ""]
     try:
-        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        lines = proc.stderr.splitlines()
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                text=True, bufsize=1)
     except Exception as e:
-        logging.error("ffmpeg not found! %d", e)
+        logging.error("ffmpeg not found! %s", e)
         return []
 
+    def on_timeout():
+        logging.error("ffmpeg timed out while listing devices!")
+        proc.kill()
+
+    # Kill ffmpeg if it hangs, which also unblocks the stderr read below
+    watchdog = threading.Timer(3.0, on_timeout)
+    watchdog.start()
+
     audio_dev_section = False
     devices = []
-    audio_dev_regex = re.compile(r'^\[AVFoundation [^]]+ @.*\]\s+\[(\d+)\]\s+(.+)$')
-    for line in lines:
-        line = line.strip()
-        if "AVFoundation audio devices:" in line:
-            audio_dev_section = True
-            continue
-        if "AVFoundation video devices:" in line:
-            audio_dev_section = False
-            continue
-        if audio_dev_section:
-            match = audio_dev_regex.match(line)
-            if match:
-                idx_str, name = match.groups()
-                devices.append((idx_str, name))
+    try:
+        for line in proc.stderr:
+            line = line.rstrip("\n")
+            if not line.startswith("[AVFoundation"):
+                if audio_dev_section and devices:
+                    break  # End of the audio device listing
+                continue
+            if line.endswith("AVFoundation audio devices:"):
+                audio_dev_section = True
+                continue
+            if line.endswith("AVFoundation video devices:"):
+                if devices:
+                    break  # Audio section already parsed, nothing left to collect
+                audio_dev_section = False
+                continue
+            if audio_dev_section:
+                match = _AUDIO_DEV_RE.match(line)
+                if match:
+                    idx_str, name = match.groups()
+                    devices.append((idx_str, name))
+    finally:
+        watchdog.cancel()
+        # No need to wait for ffmpeg's own cleanup once we have what we need
+        if proc.poll() is None:
+            proc.terminate()
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        proc.stderr.close()
+
     return devices
 
+@lru_cache(maxsize=64)
 def infer_channel_count(device_name: str) -> int:
     """
     Tries to guess the number of channels by looking for patterns like '16ch', '8ch', etc.
     If none is found, defaults to 2.
     """
-    match = re.search(r'(\d+)ch', device_name.lower())
+    match = _CHANNEL_COUNT_RE.search(device_name)
     if match:
         return int(match.group(1))
     return 2  # fallback
 
+def interrupt_process_group(proc: subprocess.Popen) -> None:
+    """
+    Sends SIGINT to the process group of `proc`, used when FFmpeg ignores its "q" command.
+    """
+    try:
+        os.killpg(os.getpgid(proc.pid), signal.SIGINT)
+    except ProcessLookupError:
+        pass  # FFmpeg already exited
+
+def request_quit(proc: subprocess.Popen) -> None:
+    """
+    Sends FFmpeg its "q" quit command, which finalizes the file like Ctrl+C does.
+    Falls back to interrupting its process group if stdin is no longer writable.
+    """
+    try:
+        proc.stdin.write(b"q\n")
+        proc.stdin.flush()
+    except OSError:
+        interrupt_process_group(proc)
+
+def wait_for_exit(proc: subprocess.Popen, timeout: float = 3.0) -> None:
+    """
+    Waits for FFmpeg to exit after a "q" command. Escalates to SIGINT and finally
+    SIGKILL if it does not exit within `timeout` seconds at each step.
+    """
+    try:
+        proc.wait(timeout=timeout)
+        return
+    except subprocess.TimeoutExpired:
+        interrupt_process_group(proc)
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        logging.warning("FFmpeg ignored SIGINT, killing it.")
+        proc.kill()
+        proc.wait()
+
+@lru_cache(maxsize=64)
+def _channel_lists(total: int) -> tuple:
+    """
+    Returns the mono channel values (1..total) and stereo pair values
+    ("1-2", "3-4", ...) for the given total channel count.
+    """
+    mono_values = tuple(range(1, total + 1))
+    stereo_vals = tuple(f"{i}-{i+1}" for i in range(1, total, 2)) or ("1-2",)
+    return mono_values, stereo_vals
+
 class SimpleRecorder(tk.Tk):
     """
     Main recorder class.
@@ -75,45 +207,69 @@ class SimpleRecorder(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Recorder")
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Channel list / mode refreshes are skipped until the UI and defaults are in place,
+        # see _finalize_ui()
+        self._suspend_updates = True
 
         # Use the default theme
         style = ttk.Style(self)
         style.theme_use("default")
 
-        # Configure label style
-        style.configure("TLabel",
-                        font=("Helvetica", 12))
-
-        # Configure entry style
-        style.configure("TEntry",
-                        font=("Helvetica", 12),
-                        padding=5)
-
-        # Configure button style
-        style.configure("TButton",
-                        font=("Helvetica", 12, "bold"),
-                        padding=6)
-
-        # Configure label frame style
-        style.configure("TLabelframe",
-                        font=("Helvetica", 12, "bold"),
-                        padding=10)
-        style.configure("TLabelframe.Label",
-                        font=("Helvetica", 13, "bold"))
+        # Shared named fonts, created once and reused by all styles and widgets
+        self._font_body = tkfont.Font(name="SR.Body", family="Helvetica", size=12)
+        self._font_bold = tkfont.Font(name="SR.Btn", family="Helvetica", size=12, weight="bold")
+        self._font_header = tkfont.Font(name="SR.Hdr", family="Helvetica", size=13, weight="bold")
+        self._font_status = tkfont.Font(name="SR.Status", family="Helvetica", size=13,
+                                        slant="italic")
+
+        # Configure label, entry, button and label frame styles in a single Tcl call
+        style.theme_settings("default", {
+            "TLabel": {"configure": {"font": self._font_body}},
+            "TEntry": {"configure": {"font": self._font_body,
+                                     "padding": 5}},
+            "TButton": {"configure": {"font": self._font_bold,
+                                      "padding": 6}},
+            "TLabelframe": {"configure": {"font": self._font_bold,
+                                          "padding": 10}},
+            "TLabelframe.Label": {"configure": {"font": self._font_header}},
+        })
 
         # Some padding for the root window
         self.config(padx=20, pady=20)
 
         # Attempt to maximize the window (windowed fullscreen)
-        self.update_idletasks()
-        self.state('zoomed')
+        try:
+            self.state('zoomed')
+        except tk.TclError:
+            self.attributes('-zoomed', True)  # X11 has no 'zoomed' state
 
-        # Gather audio devices
-        self.audio_devices = get_avfoundation_audio_devices()
-        if not self.audio_devices:
-            self.audio_devices = [("0", "Default Device (not found by FFmpeg)")]
+        # Audio devices are enumerated in the background, see _enumerate_devices_bg()
+        self.audio_devices = [("0", "Detecting...")]
+        self._current_device = self.audio_devices[0]
+        self.devices_loaded = False
+        self.preferred_device_index = None
 
         self.record_process = None
+        self.stopping = False
+
+        # WAV sample encoding, 16 bit halves the write bandwidth of 24/32 bit
+        self.pcm_codec = "pcm_s16le"
+
+        # Values last written to the mono / stereo dropdowns, see update_channel_lists()
+        self._last_mono_values = None
+        self._last_stereo_values = None
+
+        # Last channel count filled in automatically, to tell it apart from user input
+        self._inferred_total_channels = None
+
+        # Recording command pieces per input mode, see start_recording()
+        self._mode_builders = {
+            "mono": self._build_mono,
+            "stereo": self._build_stereo,
+            "multichannel": self._build_multichannel,
+        }
 
         # ========== Main Frame ==========
         main_frame = ttk.Frame(self)
@@ -128,7 +284,7 @@ class SimpleRecorder(tk.Tk):
             row=0, column=0, padx=5, pady=5, sticky="e")
         self.device_var = tk.StringVar(value=self.audio_devices[0][0])
         device_names = [f"{idx}: {name}" for (idx, name) in self.audio_devices]
-        self.device_combo = ttk.Combobox(main_frame, values=device_names, state="readonly", width=40)
+        self.device_combo = ttk.Combobox(main_frame, values=device_names, state="disabled", width=40)
         self.device_combo.current(0)
         self.device_combo.grid(row=0, column=1, padx=5, pady=5, sticky="w")
         self.device_combo.bind("<<ComboboxSelected>>", self.on_device_changed)
@@ -164,6 +320,8 @@ class SimpleRecorder(tk.Tk):
         ttk.Label(main_frame, text="Destination Folder:").grid(
             row=4, column=0, padx=5, pady=5, sticky="e")
         self.dest_path_var = tk.StringVar()
+        self._destination_folder = None
+        self.dest_path_var.trace_add("write", self.on_destination_changed)
         ttk.Entry(main_frame, textvariable=self.dest_path_var, width=30).grid(
             row=4, column=1, padx=5, pady=5, sticky="w")
         ttk.Button(main_frame, text="Browse...", command=self.choose_folder).grid(
@@ -208,7 +366,9 @@ class SimpleRecorder(tk.Tk):
         # Buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=6, column=0, columnspan=3, padx=5, pady=10, sticky="ew")
-        self.record_button = ttk.Button(button_frame, text="Record ⏺", command=self.start_recording)
+        # Enabled once the device list is confirmed by FFmpeg, see _populate_devices()
+        self.record_button = ttk.Button(button_frame, text="Record ⏺",
+                                        command=self.start_recording, state="disabled")
         self.record_button.grid(row=0, column=0, padx=15, pady=5)
         self.stop_button = ttk.Button(button_frame, text="Stop ⏹", command=self.stop_recording)
         self.stop_button.grid(row=0, column=1, padx=15, pady=5)
@@ -216,17 +376,26 @@ class SimpleRecorder(tk.Tk):
         # Status Label
         self.status_label = ttk.Label(main_frame,
                                       text="Not recording.",
-                                      font=("Helvetica", 13, "italic"))
+                                      font=self._font_status)
         self.status_label.grid(row=7, column=0, columnspan=3, padx=5, pady=10)
 
-        # Initialize channel lists:
-        self.update_channel_lists()
-        self.on_mode_change()
-
         # Attempt to load default settings
         self.load_default_settings()
 
-        # Finalize channel lists & mode
+        # Show the cached device list right away, then verify it in the background
+        cached_devices = load_cached_devices()
+        if cached_devices:
+            self._populate_devices(cached_devices, confirmed=False)
+        threading.Thread(target=self._enumerate_devices_bg, daemon=True).start()
+
+        # Initialize channel lists & mode once, when Tk is first idle
+        self.after_idle(self._finalize_ui)
+
+    def _finalize_ui(self) -> None:
+        """
+        Lifts the startup update suspension and refreshes channel lists and mode once.
+        """
+        self._suspend_updates = False
         self.update_channel_lists()
         self.on_mode_change()
 
@@ -245,24 +414,136 @@ class SimpleRecorder(tk.Tk):
         elif severity == LogSeverity.ERROR:
             logging.error(message)
 
-    def load_default_settings(self):
-        config_path = "defaultsettings.json"
-        if not os.path.isfile(config_path):
-            return  # No config file, do nothing
+    def _enumerate_devices_bg(self) -> None:
+        """
+        Runs on a worker thread. Queries FFmpeg for devices and hands the result
+        back to the Tk main loop, since Tk widgets must only be touched from there.
+        """
+        try:
+            devices = get_avfoundation_audio_devices()
+        except Exception as e:
+            logging.error("Could not list audio devices: %s", e)
+            devices = []
+        if devices:
+            # Rewrite on every confirmed run so the cache TTL counts from the last check
+            save_cached_devices(devices)
+        # Always report back, otherwise the device list and Record stay disabled
+        self.after(0, self._populate_devices, devices)
+
+    def _populate_devices(self, devices: list, confirmed: bool = True) -> None:
+        """
+        Fills the device dropdown from the cache (not `confirmed`) or once enumeration
+        has finished. Record is only enabled for a confirmed list, since AVFoundation
+        indices shift when interfaces are plugged in or removed.
+        """
+        if confirmed:
+            self.record_button.config(state="normal")
+        if not devices:
+            if self.devices_loaded:
+                return  # Keep showing the cached list
+            devices = [("0", "Default Device (not found by FFmpeg)")]
+        if devices == self.audio_devices:
+            return  # Cached list is still accurate
+
+        first_population = not self.devices_loaded
+        previous_device = self._current_device
+        self.audio_devices = devices
+        self.device_combo["values"] = [f"{idx}: {name}" for (idx, name) in devices]
+        self.device_combo.current(0)
+        if not first_population:
+            # Indices shift when interfaces are plugged in or removed, so prefer the name
+            if not self.select_device_by_name(previous_device[1]):
+                self.select_device(previous_device[0])
+        elif self.preferred_device_index is not None:
+            self.select_device(self.preferred_device_index)
+        self._current_device = self.audio_devices[self.device_combo.current()]
+        if not first_population and self._current_device[1] != previous_device[1]:
+            self.log_message(
+                f"Audio device changed from '{previous_device[1]}' to "
+                f"'{self._current_device[1]}', please check before recording.",
+                LogSeverity.WARNING
+            )
+        self.devices_loaded = True
+        self.device_combo.config(state="readonly")
+
+        # Re-infer the channel count for the placeholder or a different device, but keep
+        # a value the user typed or one that still belongs to the selected device
+        user_edited = self.total_channels_var.get() != self._inferred_total_channels
+        if first_population or (self._current_device[1] != previous_device[1]
+                                and not user_edited):
+            self.total_channels_var.set("")
+        self.update_channel_lists()
+
+    def select_device(self, device_index: str) -> None:
+        """
+        Selects the device with the given FFmpeg index in the dropdown, if present.
+        """
+        for i, (dev_idx, _) in enumerate(self.audio_devices):
+            if dev_idx == device_index:
+                self.device_combo.current(i)
+                self._current_device = self.audio_devices[i]
+                break
+
+    def select_device_by_name(self, device_name: str) -> bool:
+        """
+        Selects the device with the given name in the dropdown.
+        Returns whether it was found.
+        """
+        for i, (_, name) in enumerate(self.audio_devices):
+            if name == device_name:
+                self.device_combo.current(i)
+                self._current_device = self.audio_devices[i]
+                return True
+        return False
+
+    def load_default_settings(self) -> None:
+        """
+        Loads defaultsettings.json on a worker thread, the values are applied
+        on the Tk main loop once parsed.
+        """
+        threading.Thread(target=self._load_settings_bg, daemon=True).start()
 
+    def _load_settings_bg(self) -> None:
+        """
+        Runs on a worker thread. Reads and parses defaultsettings.json.
+        """
+        config_path = "defaultsettings.json"
         try:
-            with open(config_path, "r", encoding="UTF8") as f:
-                data = json.load(f)
+            with open(config_path, "rb") as f:
+                data = json.loads(f.read())
+        except FileNotFoundError:
+            return  # No config file, do nothing
         except Exception as e:
-            self.log_message(f"Could not load default settings: {e}", LogSeverity.ERROR)
+            self.after(0, self.log_message,
+                       f"Could not load default settings: {e}", LogSeverity.ERROR)
             return
+        self.after(0, self._on_settings_loaded, data)
 
+    def _on_settings_loaded(self, data: dict) -> None:
+        """
+        Applies loaded settings, then refreshes channel lists and mode at most once.
+        """
+        was_suspended = self._suspend_updates
+        self._suspend_updates = True
+        try:
+            self._apply_settings(data)
+        finally:
+            self._suspend_updates = was_suspended
+        if not was_suspended:
+            if "device_index" in data:
+                # Re-infer the channel count for the newly selected device
+                self.total_channels_var.set("")
+            self.update_channel_lists()
+            self.on_mode_change()
+
+    def _apply_settings(self, data: dict) -> None:
+        """
+        Applies the values of a parsed defaultsettings.json to the UI.
+        """
         if "device_index" in data:
-            loaded_idx = data["device_index"]
-            for i, (dev_idx, _) in enumerate(self.audio_devices):
-                if dev_idx == loaded_idx:
-                    self.device_combo.current(i)
-                    break
+            # Also applied once the background device enumeration has finished
+            self.preferred_device_index = data["device_index"]
+            self.select_device(self.preferred_device_index)
 
         if "stream_index" in data:
             self.stream_index_var.set(data["stream_index"])
@@ -282,6 +563,9 @@ class SimpleRecorder(tk.Tk):
         if "stereo_pair" in data:
             self.stereo_pair_var.set(data["stereo_pair"])
 
+        if "pcm_codec" in data and data["pcm_codec"] in ("pcm_s16le", "pcm_s24le", "pcm_s32le"):
+            self.pcm_codec = data["pcm_codec"]
+
     def choose_folder(self):
         """
         Chooses a folder for the output file.
@@ -290,86 +574,115 @@ class SimpleRecorder(tk.Tk):
         if folder:
             self.dest_path_var.set(folder)
 
-    def on_device_changed(self) -> None:
+    def on_destination_changed(self, *_) -> None:
+        """
+        Keeps the parsed destination folder in sync with the entry field.
+        """
+        folder = self.dest_path_var.get().strip()
+        self._destination_folder = Path(folder) if folder else None
+
+    def on_device_changed(self, _event=None) -> None:
         """
         Handles device change events.
         """
+        self._current_device = self.audio_devices[self.device_combo.current()]
         self.update_channel_lists()
 
     def update_channel_lists(self) -> None:
         """
         Updates the channel list.
         """
-        chosen_device_text = self.device_combo.get()
-        if ":" in chosen_device_text:
-            name_part = chosen_device_text.split(":", 1)[-1].strip()
-        else:
-            name_part = chosen_device_text.strip()
+        if self._suspend_updates:
+            return
+
+        name_part = self._current_device[1]
 
         inferred = infer_channel_count(name_part)
         if not self.total_channels_var.get().strip():
             self.total_channels_var.set(str(inferred))
+            self._inferred_total_channels = str(inferred)
 
         try:
             total = int(self.total_channels_var.get())
         except ValueError:
             total = inferred
 
-        # Mono: channels 1..total
-        mono_values = list(range(1, total + 1))
-        self.mono_channel_dropdown["values"] = mono_values
-        if self.mono_channel_var.get() not in mono_values:
+        mono_values, stereo_vals = _channel_lists(total)
+
+        # The "Detecting..." placeholder only implies 2 channels, so selections
+        # (e.g. from defaultsettings.json) are not clamped until real devices are known
+        clamp_selection = self.devices_loaded
+
+        # Only push values through Tcl when they actually changed
+        if mono_values != self._last_mono_values:
+            self.mono_channel_dropdown["values"] = mono_values
+            self._last_mono_values = mono_values
+        if clamp_selection and self.mono_channel_var.get() not in mono_values:
             self.mono_channel_var.set(mono_values[0] if mono_values else 1)
 
-        # Stereo pairs: (1-2, 3-4, 5-6, etc.)
-        stereo_vals = []
-        for i in range(1, total, 2):
-            if i + 1 <= total:
-                stereo_vals.append(f"{i}-{i+1}")
-        if not stereo_vals:
-            stereo_vals = ["1-2"]
-        self.stereo_pair_dropdown["values"] = stereo_vals
-        if self.stereo_pair_var.get() not in stereo_vals:
+        if stereo_vals != self._last_stereo_values:
+            self.stereo_pair_dropdown["values"] = stereo_vals
+            self._last_stereo_values = stereo_vals
+        if clamp_selection and self.stereo_pair_var.get() not in stereo_vals:
             self.stereo_pair_var.set(stereo_vals[0])
 
     def on_mode_change(self):
         """
         Changes the recording mode.
         """
-        mode = self.record_mode_var.get()
-        if mode == "mono":
-            self.mono_channel_dropdown.config(state="readonly")
-            self.stereo_pair_dropdown.config(state="disabled")
-        elif mode == "stereo":
-            self.mono_channel_dropdown.config(state="disabled")
-            self.stereo_pair_dropdown.config(state="readonly")
-        else:  # multichannel
-            self.mono_channel_dropdown.config(state="disabled")
-            self.stereo_pair_dropdown.config(state="disabled")
+        if self._suspend_updates:
+            return
+
+        mono_state, stereo_state = _MODE_DROPDOWN_STATES[self.record_mode_var.get()]
+        self.mono_channel_dropdown.config(state=mono_state)
+        self.stereo_pair_dropdown.config(state=stereo_state)
+
+    def _build_mono(self, total_channels: int) -> tuple:
+        """
+        Returns the pan filter, output channel count and status text for mono recording.
+        """
+        ch = self.mono_channel_var.get() - 1
+        return f"pan=mono|c0=c{ch}", "1", f"Recording MONO (channel {ch+1})"
+
+    def _build_stereo(self, total_channels: int) -> tuple:
+        """
+        Returns the pan filter, output channel count and status text for stereo recording.
+        Raises ValueError if the selected stereo pair cannot be parsed.
+        """
+        left_str, right_str = self.stereo_pair_var.get().split("-")
+        left = int(left_str) - 1
+        right = int(right_str) - 1
+        return (f"pan=stereo|c0=c{left}|c1=c{right}", "2",
+                f"Recording STEREO (channels {left+1}-{right+1})")
+
+    def _build_multichannel(self, total_channels: int) -> tuple:
+        """
+        Returns the (empty) pan filter, output channel count and status text for
+        multichannel recording, which keeps all input channels as-is.
+        """
+        return None, None, f"Recording MULTICHANNEL (all {total_channels} channels)"
 
     def start_recording(self) -> None:
         """
         Starts the recording
         """
+        if self.stopping:
+            self.log_message("Still finishing the previous recording.", LogSeverity.WARNING)
+            return
         if self.record_process and self.record_process.poll() is None:
             self.log_message("Already recording.", LogSeverity.WARNING)
             return
 
         file_name = self.file_name_var.get().strip()
-        now_str = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        now_str = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
         file_name_with_timestamp = f"{now_str}"
         if file_name:
             file_name_with_timestamp += f"_{file_name}"
         file_name_with_timestamp += ".wav"
-        destination_folder = self.dest_path_var.get().strip() or os.getcwd()
-        output_path = os.path.join(destination_folder, file_name_with_timestamp)
+        destination_folder = self._destination_folder or Path.cwd()
+        output_path = str(destination_folder / file_name_with_timestamp)
 
-        chosen_device_text = self.device_combo.get()
-        try:
-            device_index = chosen_device_text.split(":", 1)[0].strip()
-        except Exception as e:
-            self.log_message(f"Error getting device index: {e}", LogSeverity.ERROR)
-            device_index = "0"
+        device_index = self._current_device[0]
 
         audio_stream_idx = self.stream_index_var.get()
         mode = self.record_mode_var.get()
@@ -380,63 +693,86 @@ class SimpleRecorder(tk.Tk):
             self.log_message(f"Error getting total channels: {e}", LogSeverity.ERROR)
             total_channels = 2
 
+        # Per-mode pan filter and output channel count (None records all channels as-is).
+        # A pan with unit gains is handled by FFmpeg as a pure channel mapping, without
+        # mixing; -map_channel is not used since it was removed in FFmpeg 7.
+        try:
+            pan_af, out_ac, status = self._mode_builders[mode](total_channels)
+        except ValueError as e:
+            pan_af = out_ac = status = None
+            self.log_message(f"Stereo fallback -> {output_path} (Error: {e})", LogSeverity.WARNING)
+
         cmd = [
-            "ffmpeg",
-            "-thread_queue_size", "512",  # or 1024
-            "-y",
-            "-f", "avfoundation",
+            *_FFMPEG_RECORD_BASE,
+            # Larger input queue for more channels avoids dropped packets on slow disks
+            "-thread_queue_size", str(max(1024, total_channels * 256)),
+            "-use_wallclock_as_timestamps", "1",
             "-i", f":{device_index}",
             "-ac", str(total_channels),
+            "-map", f"0:{audio_stream_idx}?",
+            *(("-af", pan_af, "-ac", out_ac) if pan_af else ()),
+            "-c:a", self.pcm_codec,
+            output_path,
         ]
-        cmd.extend(["-map", f"0:{audio_stream_idx}?"])
-
-        if mode == "mono":
-            ch = self.mono_channel_var.get() - 1
-            pan_str = f"pan=mono|c0=c{ch}"
-            cmd.extend(["-af", pan_str, "-ac", "1", output_path])
+        if status:
             self.log_message(
-                f"Recording MONO (channel {ch+1}) on device :{device_index} "
-                f"stream {audio_stream_idx} -> {output_path}",
-                LogSeverity.INFO
-            )
-        elif mode == "stereo":
-            pair = self.stereo_pair_var.get()
-            try:
-                left_str, right_str = pair.split("-")
-                left = int(left_str) - 1
-                right = int(right_str) - 1
-                pan_str = f"pan=stereo|c0=c{left}|c1=c{right}"
-                cmd.extend(["-af", pan_str, "-ac", "2", output_path])
-                self.log_message(
-                    f"Recording STEREO (channels {left+1}-{right+1}) on device :{device_index} "
-                    f"stream {audio_stream_idx} -> {output_path}",
-                    LogSeverity.INFO
-                )
-            except Exception as e:
-                self.log_message(f"Stereo fallback -> {output_path} (Error: {e})", LogSeverity.WARNING)
-                cmd.append(output_path)
-        else:
-            cmd.append(output_path)
-            self.log_message(
-                f"Recording MULTICHANNEL (all {total_channels} channels) on device :{device_index} "
+                f"{status} on device :{device_index} "
                 f"stream {audio_stream_idx} -> {output_path}",
                 LogSeverity.INFO
             )
 
-        self.record_process = subprocess.Popen(cmd)
+        # Own session so signals only reach FFmpeg, stdin for its "q" quit command
+        self.record_process = subprocess.Popen(cmd, stdin=subprocess.PIPE, start_new_session=True)
 
     def stop_recording(self) -> None:
         """
         Stops the recording.
         """
+        if self.stopping:
+            return  # Already waiting for FFmpeg to finish
         if self.record_process and self.record_process.poll() is None:
-            self.record_process.send_signal(signal.SIGINT)
-            self.record_process.wait()
-            self.record_process = None
-            self.log_message("Recording stopped.", LogSeverity.INFO)
+            proc = self.record_process
+            request_quit(proc)
+            self.stopping = True
+            self.log_message("Stopping recording...", LogSeverity.INFO)
+            # Wait on a worker thread so the UI stays responsive while FFmpeg finalizes the file
+            threading.Thread(target=self._wait_and_notify, args=(proc,), daemon=True).start()
         else:
             self.log_message("Not currently recording.", LogSeverity.WARNING)
 
+    def _wait_and_notify(self, proc: subprocess.Popen) -> None:
+        """
+        Runs on a worker thread. Waits for FFmpeg to exit, interrupting or killing it
+        if the "q" command is ignored, then reports back on the Tk main loop.
+        """
+        try:
+            wait_for_exit(proc)
+        finally:
+            # Closing re-raises if the "q" could not be flushed to an exited FFmpeg
+            with contextlib.suppress(OSError):
+                proc.stdin.close()
+            self.after(0, self._on_stopped)
+
+    def _on_stopped(self) -> None:
+        """
+        Resets the recording state once FFmpeg has exited.
+        """
+        self.record_process = None
+        self.stopping = False
+        self.log_message("Recording stopped.", LogSeverity.INFO)
+
+    def on_close(self) -> None:
+        """
+        Handles closing the window. FFmpeg runs in its own session and would keep
+        recording after the app exits, so a running recording is stopped first.
+        """
+        proc = self.record_process
+        if proc and proc.poll() is None:
+            if not self.stopping:
+                request_quit(proc)
+            wait_for_exit(proc)
+        self.destroy()
+
 if __name__ == "__main__":
     app = SimpleRecorder()
     app.mainloop()